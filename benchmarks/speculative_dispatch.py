@@ -0,0 +1,149 @@
+"""Benchmark speculative dispatch on recorded fixture audio.
+
+Runs the recorder's VAD cutting over one or more WAV files (mono, 16-bit
+PCM) and models when the reply would arrive with and without speculative
+dispatch, given a fixed transcription time and n8n round trip::
+
+    python -m benchmarks.speculative_dispatch fixtures/*.wav --stt-ms 400 --rtt-ms 1200
+
+Time is measured in audio time, so the result is deterministic for a given
+set of fixtures and settings. Saved latency is negative for utterances where
+discarded speculative transcriptions delayed the final one.
+"""
+from __future__ import annotations
+
+import argparse
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from src.audio_recorder import AudioRecorder, RecorderSettings
+
+
+@dataclass
+class UtteranceResult:
+    baseline_ms: float
+    speculative_ms: float
+
+    @property
+    def saved_ms(self) -> float:
+        return self.baseline_ms - self.speculative_ms
+
+
+@dataclass
+class _Simulation:
+    """Replay SpeculativeDispatcher in audio time with a single STT worker.
+
+    A speculative transcription cannot be interrupted once started, so a
+    cancelled one keeps the worker busy and can delay the final
+    transcription. Pauses that arrive while the worker is busy are skipped,
+    as in the dispatcher.
+    """
+
+    stt_ms: float
+    rtt_ms: float
+    position_ms: int = 0
+    stt_free_ms: float = 0.0
+    speculation_ms: Optional[float] = None
+    wasted_requests: int = 0
+    wasted_transcriptions: int = 0
+    skipped: int = 0
+
+    def on_pause(self, audio: bytes) -> None:
+        if self.stt_free_ms > self.position_ms:
+            self.skipped += 1
+            return
+        self.stt_free_ms = self.position_ms + self.stt_ms
+        self.speculation_ms = self.stt_free_ms
+
+    def on_resume(self) -> None:
+        if self.speculation_ms is None:
+            return
+        # The request only reached n8n if transcription finished first.
+        if self.position_ms >= self.speculation_ms:
+            self.wasted_requests += 1
+        else:
+            self.wasted_transcriptions += 1
+        self.speculation_ms = None
+
+    def finish(self) -> float:
+        """Return the time from the endpoint until the reply arrives."""
+
+        end_ms = self.position_ms
+        if self.speculation_ms is not None:
+            ready_ms = self.speculation_ms + self.rtt_ms
+            self.speculation_ms = None
+            return max(0.0, ready_ms - end_ms)
+        start_ms = max(end_ms, self.stt_free_ms)
+        self.stt_free_ms = start_ms + self.stt_ms
+        return self.stt_free_ms + self.rtt_ms - end_ms
+
+
+def read_chunks(wav: wave.Wave_read, settings: RecorderSettings, simulation: _Simulation) -> Iterator[bytes]:
+    frames = int(settings.sample_rate * settings.chunk_ms / 1000)
+    while True:
+        chunk = wav.readframes(frames)
+        if len(chunk) < frames * 2:
+            return
+        simulation.position_ms += settings.chunk_ms
+        yield chunk
+
+
+def run_fixture(path: Path, settings: RecorderSettings, simulation: _Simulation) -> List[UtteranceResult]:
+    baseline = simulation.stt_ms + simulation.rtt_ms
+    results: List[UtteranceResult] = []
+    with wave.open(str(path), "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: endast mono 16-bit PCM stöds")
+        settings.sample_rate = wav.getframerate()
+        recorder = AudioRecorder(settings)
+        chunks = read_chunks(wav, settings, simulation)
+        while True:
+            audio = recorder.cut_utterance(chunks, simulation.on_pause, simulation.on_resume)
+            if not audio:
+                return results
+            results.append(UtteranceResult(baseline_ms=baseline, speculative_ms=simulation.finish()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mät spekulativ dispatch på inspelat ljud")
+    parser.add_argument("fixtures", nargs="+", type=Path, help="WAV-filer (mono, 16-bit PCM)")
+    parser.add_argument("--stt-ms", type=float, default=400, help="Antagen transkriberingstid")
+    parser.add_argument("--rtt-ms", type=float, default=1200, help="Antagen tid från POST till svar från n8n")
+    parser.add_argument("--pause-ms", type=int, default=RecorderSettings.speculative_pause_ms, help="Paus som startar en spekulativ fråga")
+    parser.add_argument("--silence-ms", type=int, default=RecorderSettings.silence_ms, help="Tystnad som avslutar ett yttrande")
+    args = parser.parse_args()
+
+    results: List[UtteranceResult] = []
+    wasted_requests = wasted_transcriptions = skipped = 0
+    for path in args.fixtures:
+        settings = RecorderSettings(speculative_pause_ms=args.pause_ms, silence_ms=args.silence_ms)
+        simulation = _Simulation(stt_ms=args.stt_ms, rtt_ms=args.rtt_ms)
+        fixture_results = run_fixture(path, settings, simulation)
+        saved = sum(result.saved_ms for result in fixture_results)
+        print(
+            f"{path}: {len(fixture_results)} yttranden, {saved:.0f} ms sparat, "
+            f"{simulation.wasted_requests} onödiga frågor"
+        )
+        results.extend(fixture_results)
+        wasted_requests += simulation.wasted_requests
+        wasted_transcriptions += simulation.wasted_transcriptions
+        skipped += simulation.skipped
+
+    if not results:
+        print("Inga yttranden hittades i ljudfilerna.")
+        return
+    saved = [result.saved_ms for result in results]
+    print(
+        f"\nTotalt: {len(results)} yttranden\n"
+        f"Sparad latens: {sum(saved) / len(saved):.0f} ms i snitt, "
+        f"{min(saved):.0f} ms min, {max(saved):.0f} ms max\n"
+        f"Onödiga spekulativa frågor till n8n: {wasted_requests}\n"
+        f"Avbrutna transkriberingar utan fråga: {wasted_transcriptions}\n"
+        f"Pauser utan spekulation (transkribering pågick): {skipped}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,11 @@ from pathlib import Path
 from .app_config import AppConfig
 from .audio_recorder import AudioRecorder
 from .config_flow import ConfigurationFlow
+from .latency_probe import LatencyProbe, format_report
 from .n8n_webhook_client import N8nWebhookClient
 from .reply_broker import ReplyBroker
 from .reply_server import ReplyWebhookServer
+from .speculative_dispatch import SpeculativeDispatcher
 from .speech_to_text import SpeechToText
 from .text_to_speech import PiperTextToSpeech
 
@@ -35,10 +37,30 @@ def build_components(config: AppConfig):
     return recorder, stt, tts, client, webhook_server
 
 
+def run_probe(config: AppConfig, count: int, concurrency: int) -> None:
+    client = N8nWebhookClient(config, ReplyBroker())
+    webhook_server = ReplyWebhookServer(config, client)
+    webhook_server.start()
+    if not webhook_server.wait_until_started():
+        webhook_server.stop()
+        print("⚠️  Svarswebhooken startade inte, kontrollera app.listen_host och app.listen_port.")
+        return
+    print(f"⏱️  Kör {count} rundor mot n8n med samtidighet {concurrency}…")
+    try:
+        probe = LatencyProbe(client, device=os.uname().nodename)
+        samples = probe.run(count, concurrency)
+    finally:
+        webhook_server.stop()
+    print(format_report(samples, concurrency))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Genio Bot röstassistent")
     parser.add_argument("--config", default="config.yaml", help="Sökväg till konfigurationsfilen")
     parser.add_argument("--configure", action="store_true", help="Kör konfigurationsguiden")
+    parser.add_argument("--probe", action="store_true", help="Mät latensen mot n8n och skriv ut p50/p95/p99 per fas")
+    parser.add_argument("--probe-count", type=int, default=20, help="Antal rundor i latensproben")
+    parser.add_argument("--probe-concurrency", type=int, default=1, help="Antal samtidiga rundor i latensproben")
     args = parser.parse_args()
 
     config_path = Path(args.config)
@@ -50,25 +72,40 @@ def main() -> None:
     else:
         config = AppConfig.load(config_path)
 
+    if args.probe:
+        run_probe(config, args.probe_count, args.probe_concurrency)
+        return
+
     recorder, stt, tts, client, webhook_server = build_components(config)
     webhook_server.start()
 
     recorder.start()
     device_name = os.uname().nodename
+    speculation = None
+    if config.app.speculative_dispatch:
+        speculation = SpeculativeDispatcher(stt, client, recorder.sample_rate, device=device_name)
     print("\n🎤  Tala när du är redo. Pausa för att skicka frågan till n8n. Ctrl+C för att avsluta.")
 
     try:
         while True:
-            audio = recorder.read_utterance()
+            if speculation is not None:
+                audio = recorder.read_utterance(on_pause=speculation.on_pause, on_resume=speculation.on_resume)
+            else:
+                audio = recorder.read_utterance()
             if not audio:
                 continue
-            text = stt.transcribe(audio, recorder.sample_rate)
-            if not text:
-                print("(Ingen text uppfattades, försök igen)")
-                continue
-            print(f"→ Skickar till n8n: {text}")
             try:
-                reply = client.ask(text, device=device_name)
+                if speculation is not None:
+                    # The question may already have been sent during a pause.
+                    text, pending = speculation.commit(audio)
+                else:
+                    text = stt.transcribe(audio, recorder.sample_rate)
+                    pending = client.dispatch(text, device=device_name) if text else None
+                if not text or pending is None:
+                    print("(Ingen text uppfattades, försök igen)")
+                    continue
+                print(f"→ Skickat till n8n: {text}")
+                reply = client.wait_for_reply(pending)
             except (TimeoutError, RuntimeError) as exc:
                 print(f"⚠️  {exc}")
                 continue
@@ -77,6 +114,12 @@ def main() -> None:
     except KeyboardInterrupt:
         print("Avslutar…")
     finally:
+        if speculation is not None:
+            speculation.close()
+            print(
+                f"Spekulativa frågor: {speculation.dispatched} skickade, "
+                f"{speculation.wasted} avbrutna"
+            )
         recorder.stop()
         webhook_server.stop()
 
@@ -25,10 +25,16 @@ class N8nSettings:
     server_url: str = "https://ai.genio-bot.com"
     text_webhook_path: str = "/webhook/text-input"
     response_webhook_path: str = "/webhook/genio-bot-response"
+    cancel_webhook_path: str = ""
 
     def question_url(self) -> str:
         return _join_url(self.server_url, self.text_webhook_path)
 
+    def cancel_url(self) -> str | None:
+        if not self.cancel_webhook_path:
+            return None
+        return _join_url(self.server_url, self.cancel_webhook_path)
+
     def response_url(self) -> str:
         return _join_url(self.server_url, self.response_webhook_path)
 
@@ -42,6 +48,7 @@ class AppRuntimeSettings:
     listen_host: str = "0.0.0.0"
     listen_port: int = 8010
     reply_timeout_s: int = 45
+    speculative_dispatch: bool = False
 
     def reply_webhook_url(self) -> str:
         return _join_url(self.public_base_url, self.reply_webhook_path)
@@ -102,6 +109,7 @@ class AppConfig:
                 "server_url": self.n8n.server_url,
                 "text_webhook_path": self.n8n.text_webhook_path,
                 "response_webhook_path": self.n8n.response_webhook_path,
+                "cancel_webhook_path": self.n8n.cancel_webhook_path,
             },
             "app": {
                 "public_base_url": self.app.public_base_url,
@@ -109,6 +117,7 @@ class AppConfig:
                 "listen_host": self.app.listen_host,
                 "listen_port": self.app.listen_port,
                 "reply_timeout_s": self.app.reply_timeout_s,
+                "speculative_dispatch": self.app.speculative_dispatch,
             },
             "stt": {
                 "model_size": self.stt.model_size,
@@ -3,11 +3,14 @@ from __future__ import annotations
 
 import queue
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable
 
 import numpy as np
-import sounddevice as sd
 import webrtcvad
 
+if TYPE_CHECKING:
+    import sounddevice as sd
+
 
 @dataclass
 class RecorderSettings:
@@ -18,6 +21,7 @@ class RecorderSettings:
     min_voice_ms: int = 300
     max_record_ms: int = 10000
     silence_ms: int = 800
+    speculative_pause_ms: int = 300
 
 
 class AudioRecorder:
@@ -37,6 +41,9 @@ class AudioRecorder:
     def start(self) -> None:
         if self._stream is not None:
             return
+        # Imported here so that cut_utterance() works without PortAudio installed.
+        import sounddevice as sd
+
         blocksize = int(self.settings.sample_rate * self.settings.chunk_ms / 1000)
         self._stream = sd.InputStream(
             samplerate=self.settings.sample_rate,
@@ -63,24 +70,54 @@ class AudioRecorder:
         audio = (mono * 32767).astype(np.int16).tobytes()
         self._queue.put(audio)
 
-    def read_utterance(self) -> bytes:
-        """Read audio until silence and return it as raw PCM16."""
+    def read_utterance(
+        self,
+        on_pause: Callable[[bytes], None] | None = None,
+        on_resume: Callable[[], None] | None = None,
+    ) -> bytes:
+        """Read audio until silence and return it as raw PCM16.
+
+        ``on_pause`` is called with the audio captured so far once the speaker
+        has been quiet for ``speculative_pause_ms``; ``on_resume`` is called if
+        speech then continues before the utterance ends.
+        """
+        return self.cut_utterance(iter(self._queue.get, None), on_pause, on_resume)
+
+    def cut_utterance(
+        self,
+        chunks: Iterable[bytes],
+        on_pause: Callable[[bytes], None] | None = None,
+        on_resume: Callable[[], None] | None = None,
+    ) -> bytes:
+        """Consume ``chunks`` until the utterance ends, see :meth:`read_utterance`."""
         voiced = bytearray()
         voiced_ms = 0
         silence_ms = 0
+        paused = False
         settings = self.settings
-        while True:
-            chunk = self._queue.get()
+        for chunk in chunks:
             is_speech = self._vad.is_speech(chunk, settings.sample_rate)
             ms = int(len(chunk) / 2 / settings.sample_rate * 1000)
             if is_speech:
                 voiced.extend(chunk)
                 voiced_ms += ms
                 silence_ms = 0
+                if paused:
+                    paused = False
+                    if on_resume:
+                        on_resume()
             else:
                 silence_ms += ms
             if voiced_ms >= settings.min_voice_ms and silence_ms >= settings.silence_ms:
                 break
             if voiced_ms >= settings.max_record_ms:
                 break
+            if (
+                on_pause
+                and not paused
+                and voiced_ms >= settings.min_voice_ms
+                and silence_ms >= settings.speculative_pause_ms
+            ):
+                paused = True
+                on_pause(bytes(voiced))
         return bytes(voiced)
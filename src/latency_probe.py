@@ -0,0 +1,226 @@
+"""Timed round trips against n8n, broken down per phase."""
+from __future__ import annotations
+
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+from .n8n_webhook_client import N8nWebhookClient, default_headers
+
+PHASES = ("dns", "connect", "ttfb", "post", "callback", "total")
+
+
+@dataclass
+class ProbeSample:
+    """Phase durations in milliseconds for a single round trip."""
+
+    phases: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    address: Optional[str] = None
+    fallbacks: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``values`` using linear interpolation."""
+
+    if not values:
+        raise ValueError("percentile() kräver minst ett värde")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class LatencyProbe:
+    """Run timed question/reply round trips through n8n.
+
+    Each round trip is split into the following phases:
+
+    ``dns``
+        Resolving the n8n host name.
+    ``connect``
+        TCP connect plus TLS handshake to the address found by ``dns``.
+    ``ttfb``
+        From sending the request headers until the response headers arrive.
+    ``post``
+        The complete ``POST`` to the question webhook, including ``connect``,
+        ``ttfb`` and reading the response body but not ``dns``.
+    ``callback``
+        From the ``POST`` completing until the reply reaches
+        ``ReplyWebhookServer``. Zero if the reply arrived before the
+        ``POST`` returned.
+    ``total``
+        From the start of the round trip until the reply arrived.
+
+    A fresh connection is opened for every round trip so that ``dns`` and
+    ``connect`` are measured each time. The request is sent to the resolved
+    address with the original ``Host`` header and TLS server name, so the
+    host name is not looked up a second time inside ``connect``. Like
+    ``socket.create_connection``, the next resolved address is tried when
+    one cannot be reached; ``connect`` covers only the address that
+    answered, while the failed attempts count towards ``post``. The reply
+    webhook server must be running for the callback to be received.
+    """
+
+    def __init__(self, client: N8nWebhookClient, test_text: str = "latency probe", device: str | None = None):
+        self.client = client
+        self.test_text = test_text
+        self.device = device
+
+    def run(self, count: int, concurrency: int = 1) -> List[ProbeSample]:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            return list(executor.map(lambda _: self.round_trip(), range(count)))
+
+    def round_trip(self) -> ProbeSample:
+        config = self.client.config
+        url = httpx.URL(config.n8n.question_url())
+        port = url.port or (443 if url.scheme == "https" else 80)
+        sample = ProbeSample()
+
+        conversation_id = str(uuid.uuid4())
+        payload = {
+            "text": self.test_text,
+            "conversation_id": conversation_id,
+            "callback_url": config.app.reply_webhook_url(),
+        }
+        if self.device:
+            payload["device"] = self.device
+
+        events: Dict[str, float] = {}
+
+        def trace(name: str, info: dict) -> None:
+            # Redirects emit the same events again; keep the first hop.
+            events.setdefault(name, time.perf_counter())
+
+        def restore_resolution(request: httpx.Request) -> None:
+            # A redirect to another host must use that host's own name for TLS.
+            if request.url.host not in (url.host, address.host):
+                request.extensions = {
+                    key: value for key, value in request.extensions.items() if key != "sni_hostname"
+                }
+
+        # Build the client up front so that creating the SSL context is not
+        # counted as network time.
+        http = httpx.Client(
+            timeout=config.app.reply_timeout_s,
+            follow_redirects=True,
+            headers=default_headers(),
+            event_hooks={"request": [restore_resolution]},
+        )
+        pending = self.client.broker.create(conversation_id)
+        try:
+            started = time.perf_counter()
+            try:
+                addresses = socket.getaddrinfo(url.host, port, proto=socket.IPPROTO_TCP)
+            except socket.gaierror as exc:
+                sample.error = f"DNS-uppslag misslyckades: {exc}"
+                return sample
+            resolved = time.perf_counter()
+            sample.phases["dns"] = (resolved - started) * 1000
+            hosts = list(dict.fromkeys(info[4][0] for info in addresses))
+
+            try:
+                for attempt, host in enumerate(hosts):
+                    events.clear()
+                    address = url.copy_with(host=host)
+                    try:
+                        response = http.post(
+                            address,
+                            json=payload,
+                            headers={"Host": url.netloc.decode("ascii")},
+                            extensions={"trace": trace, "sni_hostname": url.host},
+                        )
+                        break
+                    except (httpx.ConnectError, httpx.ConnectTimeout):
+                        if attempt == len(hosts) - 1:
+                            raise
+                sample.address = host
+                sample.fallbacks = attempt
+                response.raise_for_status()
+            except httpx.HTTPStatusError as exc:
+                sample.error = f"n8n-webhooken svarade med felkod {exc.response.status_code}"
+                return sample
+            except httpx.RequestError as exc:
+                sample.error = f"Kunde inte kontakta n8n-webhooken: {exc}"
+                return sample
+            posted = time.perf_counter()
+
+            sample.phases["connect"] = (
+                _span(events, "connection.connect_tcp") + _span(events, "connection.start_tls")
+            ) * 1000
+            sent = _first(events, ".send_request_headers.started")
+            first_byte = _first(events, ".receive_response_headers.complete")
+            if sent is not None and first_byte is not None:
+                sample.phases["ttfb"] = (first_byte - sent) * 1000
+            sample.phases["post"] = (posted - resolved) * 1000
+
+            remaining = config.app.reply_timeout_s - (posted - started)
+            if pending.wait(max(0.0, remaining)) is None or pending.received_at is None:
+                sample.error = f"Inget svar via callback inom {config.app.reply_timeout_s} sekunder"
+                return sample
+            sample.phases["callback"] = max(0.0, pending.received_at - posted) * 1000
+            sample.phases["total"] = (pending.received_at - started) * 1000
+            return sample
+        finally:
+            http.close()
+            self.client.broker.discard(conversation_id)
+
+
+def _span(events: Dict[str, float], prefix: str) -> float:
+    started = events.get(f"{prefix}.started")
+    complete = events.get(f"{prefix}.complete")
+    if started is None or complete is None:
+        return 0.0
+    return complete - started
+
+
+def _first(events: Dict[str, float], suffix: str) -> Optional[float]:
+    matches = [ts for name, ts in events.items() if name.endswith(suffix)]
+    return min(matches) if matches else None
+
+
+def format_report(samples: List[ProbeSample], concurrency: int = 1) -> str:
+    """Render p50/p95/p99 per phase as a plain-text table."""
+
+    succeeded = [sample for sample in samples if sample.ok]
+    failed = [sample for sample in samples if not sample.ok]
+    lines = [
+        f"Latensprobe: {len(samples)} rundor, samtidighet {concurrency} "
+        f"({len(succeeded)} lyckade, {len(failed)} misslyckade)",
+        f"{'fas':<10}{'p50':>12}{'p95':>12}{'p99':>12}",
+    ]
+    for phase in PHASES:
+        values = [sample.phases[phase] for sample in succeeded if phase in sample.phases]
+        if not values:
+            lines.append(f"{phase:<10}{'-':>12}{'-':>12}{'-':>12}")
+            continue
+        cells = "".join(f"{percentile(values, pct):>9.1f} ms" for pct in (50, 95, 99))
+        lines.append(f"{phase:<10}{cells}")
+    errors: Dict[str, int] = {}
+    for sample in failed:
+        errors[sample.error or ""] = errors.get(sample.error or "", 0) + 1
+    fallbacks = [sample for sample in samples if sample.fallbacks]
+    if fallbacks:
+        lines.append(
+            f"⚠️  {len(fallbacks)} rundor nådde inte den första adressen och använde en annan"
+        )
+    addresses: Dict[str, int] = {}
+    for sample in samples:
+        if sample.address:
+            addresses[sample.address] = addresses.get(sample.address, 0) + 1
+    if len(addresses) > 1:
+        for address, occurrences in addresses.items():
+            lines.append(f"adress {address}: {occurrences} rundor")
+    for message, occurrences in errors.items():
+        lines.append(f"⚠️  {occurrences}× {message}")
+    return "\n".join(lines)
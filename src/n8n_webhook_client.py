@@ -1,20 +1,47 @@
 """HTTP client that posts questions to n8n and awaits webhook replies."""
 from __future__ import annotations
 
+import threading
 import uuid
 
 import httpx
 
 from .app_config import AppConfig
-from .reply_broker import ReplyBroker
+from .reply_broker import PendingReply, ReplyBroker
+
+
+def default_headers() -> dict[str, str]:
+    """Return the request headers used for every call to n8n."""
+
+    return {
+        # Cloudflare sometimes blocks generic HTTP clients. Spoof a
+        # mainstream browser user agent and keep the request behaviour
+        # consistent with manual tests performed via the browser/curl.
+        "User-Agent": (
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+            "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.5 "
+            "Safari/605.1.15"
+        ),
+        # Accept JSON (n8n returns JSON here) while still allowing fallbacks
+        # similar to the browser behaviour.
+        "Accept": "application/json, */*;q=0.1",
+    }
 
 
 class N8nWebhookClient:
+    # Cancelling is best effort, so do not wait for a slow n8n as long as for a reply.
+    cancel_timeout_s = 3.0
+
     def __init__(self, config: AppConfig, broker: ReplyBroker):
         self.config = config
         self.broker = broker
 
     def ask(self, text: str, device: str | None = None) -> str:
+        return self.wait_for_reply(self.dispatch(text, device=device))
+
+    def dispatch(self, text: str, device: str | None = None) -> PendingReply:
+        """Post ``text`` to n8n and return the pending reply without waiting for it."""
+
         conversation_id = str(uuid.uuid4())
         pending = self.broker.create(conversation_id)
         payload = {
@@ -24,19 +51,7 @@ class N8nWebhookClient:
         }
         if device:
             payload["device"] = device
-        headers = {
-            # Cloudflare sometimes blocks generic HTTP clients. Spoof a
-            # mainstream browser user agent and keep the request behaviour
-            # consistent with manual tests performed via the browser/curl.
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.5 "
-                "Safari/605.1.15"
-            ),
-            # Accept JSON (n8n returns JSON here) while still allowing fallbacks
-            # similar to the browser behaviour.
-            "Accept": "application/json, */*;q=0.1",
-        }
+        headers = default_headers()
         try:
             response = httpx.post(
                 self.config.n8n.question_url(),
@@ -58,18 +73,52 @@ class N8nWebhookClient:
             raise RuntimeError(
                 "Kunde inte kontakta n8n-webhooken. Kontrollera nätverk och URL."
             ) from exc
+        return pending
+
+    def wait_for_reply(self, pending: PendingReply) -> str:
         reply = pending.wait(self.config.app.reply_timeout_s)
         if reply is None:
-            self.broker.discard(conversation_id)
+            self.broker.discard(pending.conversation_id)
             raise TimeoutError(
                 "Ingen respons mottagen från n8n-webhooken inom "
                 f"{self.config.app.reply_timeout_s} sekunder."
             )
         return reply
 
+    def cancel(self, conversation_id: str) -> None:
+        """Cancel a dispatched question and tell n8n about it when configured.
+
+        A reply that still arrives for the conversation is dropped. The call to
+        the cancel webhook is best effort and runs in the background; n8n may
+        already have answered.
+        """
+
+        self.broker.cancel(conversation_id)
+        url = self.config.n8n.cancel_url()
+        if not url:
+            return
+        threading.Thread(target=self._post_cancel, args=(url, conversation_id), daemon=True).start()
+
+    def _post_cancel(self, url: str, conversation_id: str) -> None:
+        try:
+            httpx.post(
+                url,
+                json={"conversation_id": conversation_id},
+                timeout=self.cancel_timeout_s,
+                follow_redirects=True,
+                headers=default_headers(),
+            )
+        except httpx.RequestError:
+            pass
+
     def handle_reply(self, conversation_id: str, reply: str) -> bool:
         return self.broker.resolve(conversation_id, reply)
 
+    def drop_late_reply(self, conversation_id: str) -> bool:
+        """Return ``True`` if the reply belongs to a cancelled conversation."""
+
+        return self.broker.drop_cancelled(conversation_id)
+
     def diagnose_connection(self, test_text: str = "diagnostic ping", device: str | None = None) -> dict:
         """Perform basic connectivity checks against the n8n server.
 
@@ -86,14 +135,7 @@ class N8nWebhookClient:
         contextual data such as status codes or error messages.
         """
 
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.5 "
-                "Safari/605.1.15"
-            ),
-            "Accept": "application/json, */*;q=0.1",
-        }
+        headers = default_headers()
 
         diagnostics: dict[str, dict[str, object]] = {
             "server": {"ok": False},
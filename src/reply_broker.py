@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Dict, Optional
 
@@ -10,6 +12,7 @@ from typing import Dict, Optional
 class PendingReply:
     conversation_id: str
     reply: Optional[str] = None
+    received_at: Optional[float] = None
     event: threading.Event = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
@@ -17,6 +20,7 @@ class PendingReply:
 
     def set(self, reply: str) -> None:
         self.reply = reply
+        self.received_at = time.perf_counter()
         self.event.set()
 
     def wait(self, timeout: float | None = None) -> Optional[str]:
@@ -28,8 +32,12 @@ class PendingReply:
 class ReplyBroker:
     """Maintain a registry of pending conversations."""
 
+    # How many cancelled conversation ids to remember for dropping late replies.
+    max_cancelled = 256
+
     def __init__(self) -> None:
         self._pending: Dict[str, PendingReply] = {}
+        self._cancelled: "OrderedDict[str, None]" = OrderedDict()
         self._lock = threading.Lock()
 
     def create(self, conversation_id: str) -> PendingReply:
@@ -52,3 +60,22 @@ class ReplyBroker:
         with self._lock:
             pending = self._pending.pop(conversation_id, None)
         return pending is not None
+
+    def cancel(self, conversation_id: str) -> bool:
+        """Remove a pending conversation and drop its reply if it still arrives."""
+
+        with self._lock:
+            pending = self._pending.pop(conversation_id, None)
+            self._cancelled[conversation_id] = None
+            while len(self._cancelled) > self.max_cancelled:
+                self._cancelled.popitem(last=False)
+        return pending is not None
+
+    def drop_cancelled(self, conversation_id: str) -> bool:
+        """Forget a cancelled conversation, returning whether it was cancelled."""
+
+        with self._lock:
+            if conversation_id not in self._cancelled:
+                return False
+            del self._cancelled[conversation_id]
+        return True
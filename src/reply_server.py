@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import threading
+import time
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
@@ -32,9 +33,11 @@ class ReplyWebhookServer:
 
         @app.post(self.config.app.reply_webhook_path)
         async def handle(payload: ReplyPayload):
-            if not self.client.handle_reply(payload.conversation_id, payload.reply):
-                raise HTTPException(status_code=404, detail="Ingen pågående konversation hittades")
-            return {"status": "received"}
+            if self.client.handle_reply(payload.conversation_id, payload.reply):
+                return {"status": "received"}
+            if self.client.drop_late_reply(payload.conversation_id):
+                return {"status": "dropped"}
+            raise HTTPException(status_code=404, detail="Ingen pågående konversation hittades")
 
         return app
 
@@ -56,6 +59,18 @@ class ReplyWebhookServer:
         thread.start()
         self._thread = thread
 
+    def wait_until_started(self, timeout: float = 10.0) -> bool:
+        """Block until uvicorn is listening, returning ``False`` on timeout."""
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._uvicorn is not None and self._uvicorn.started:
+                return True
+            if self._thread is None or not self._thread.is_alive():
+                return False
+            time.sleep(0.05)
+        return False
+
     def stop(self) -> None:
         if self._uvicorn:
             self._uvicorn.should_exit = True
@@ -0,0 +1,119 @@
+"""Send the transcript to n8n during a short pause, before the utterance ends."""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from .n8n_webhook_client import N8nWebhookClient
+from .reply_broker import PendingReply
+
+if TYPE_CHECKING:
+    from .speech_to_text import SpeechToText
+
+
+@dataclass
+class _Speculation:
+    audio_len: int
+    future: Optional[Future] = None
+    pending: Optional[PendingReply] = None
+    cancelled: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class SpeculativeDispatcher:
+    """Transcribe and dispatch on a pause, cancel if the speaker continues.
+
+    Wire :meth:`on_pause` and :meth:`on_resume` into
+    :meth:`AudioRecorder.read_utterance` and call :meth:`commit` with the final
+    audio. If nothing was said after the pause the speculative request is
+    reused, otherwise it is cancelled and the utterance is dispatched as usual.
+
+    A transcription that has started cannot be interrupted, so no new
+    speculation is started while an earlier one is still transcribing.
+    Otherwise discarded transcriptions would delay the final one.
+    """
+
+    def __init__(self, stt: SpeechToText, client: N8nWebhookClient, sample_rate: int, device: str | None = None):
+        self.stt = stt
+        self.client = client
+        self.sample_rate = sample_rate
+        self.device = device
+        self.dispatched = 0
+        self.wasted = 0
+        self._current: Optional[_Speculation] = None
+        self._stt_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculative")
+
+    def on_pause(self, audio: bytes) -> None:
+        self.cancel()
+        if self._stt_lock.locked():
+            return
+        speculation = _Speculation(audio_len=len(audio))
+        speculation.future = self._executor.submit(self._run, speculation, audio)
+        self._current = speculation
+
+    def on_resume(self) -> None:
+        self.cancel()
+
+    def cancel(self) -> None:
+        speculation, self._current = self._current, None
+        if speculation is None:
+            return
+        with speculation.lock:
+            speculation.cancelled = True
+            pending = speculation.pending
+        if speculation.future is not None:
+            speculation.future.cancel()
+        if pending is not None:
+            self._discard(pending)
+
+    def commit(self, audio: bytes) -> Tuple[str, Optional[PendingReply]]:
+        """Return the transcript and pending reply for the finished utterance.
+
+        The pending reply is ``None`` when nothing was transcribed.
+        """
+
+        speculation = self._current
+        if speculation is not None and speculation.audio_len == len(audio):
+            self._current = None
+            return speculation.future.result()
+        self.cancel()
+        text = self._transcribe(audio)
+        if not text:
+            return text, None
+        return text, self.client.dispatch(text, device=self.device)
+
+    def close(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _run(self, speculation: _Speculation, audio: bytes) -> Tuple[str, Optional[PendingReply]]:
+        with self._stt_lock:
+            # Checked under the lock so a cancelled job never delays commit().
+            if speculation.cancelled:
+                return "", None
+            text = self.stt.transcribe(audio, self.sample_rate)
+        if not text or speculation.cancelled:
+            return text, None
+        pending = self.client.dispatch(text, device=self.device)
+        with self._stats_lock:
+            self.dispatched += 1
+        with speculation.lock:
+            speculation.pending = pending
+            cancelled = speculation.cancelled
+        if cancelled:
+            self._discard(pending)
+            return text, None
+        return text, pending
+
+    def _transcribe(self, audio: bytes) -> str:
+        with self._stt_lock:
+            return self.stt.transcribe(audio, self.sample_rate)
+
+    def _discard(self, pending: PendingReply) -> None:
+        with self._stats_lock:
+            self.wasted += 1
+        self.client.cancel(pending.conversation_id)